@@ -0,0 +1,23 @@
+"""
+pytest公共夹具：按文件路径读取测试文本并统计词频
+"""
+
+from functools import lru_cache
+
+import pytest
+
+from main import read_file, tokenize_and_count
+
+
+@pytest.fixture(scope="session")
+def tokens():
+    """
+    返回按文件路径获取词频统计的函数，整个测试会话共用，同一文件只分词一次
+    """
+    @lru_cache(maxsize=None)
+    def _get(path):
+        text = read_file(path)
+        if text is None:
+            pytest.fail(f"缺少测试文本 {path}")
+        return tokenize_and_count(text)
+    return _get
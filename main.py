@@ -4,9 +4,44 @@
 使用方法：python main.py [原文文件] [抄袭版论文的文件] [答案文件]
 """
 
+import os
 import sys
 import jieba
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# 要过滤的标点符号
+_PUNCT = frozenset('，。！？；：""\'\'（）【】《》、')
+
+# 中文停用词
+_STOP = frozenset(['的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一', '一个', '上', '也', '很',
+                   '到', '说', '要', '去', '你', '会', '着', '没有', '看', '好', '自己', '这'])
+
+# 分词后需要过滤的全部词汇，合并为一个集合，每个词只需一次查表
+_FILTERED = _PUNCT | _STOP
+
+# 两个文本合计达到该字符数时才启用jieba并行分词
+_PARALLEL_MIN_CHARS = 500_000
+
+
+def _read_text(filename):
+    """
+    读取文件内容，文件不存在时抛出FileNotFoundError
+
+    参数:
+        filename (str): 要读取的文件路径
+
+    返回:
+        str: 文件内容字符串
+    """
+    # 以二进制方式读取全部字节（读到文件末尾为止，管道等无固定大小的文件同样适用），
+    # 再统一以UTF-8解码一次，绕过文本IO层的增量解码
+    with open(filename, 'rb') as f:
+        data = f.read()
+    content = data.decode('utf-8')
+    # 与文本模式保持一致，将\r\n和\r统一转换为\n
+    content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content.strip()  # 去除首尾空白
 
 
 def read_file(filename):
@@ -20,66 +55,119 @@ def read_file(filename):
         str: 文件内容字符串，如果文件不存在返回None
     """
     try:
-        # 以UTF-8编码打开文件并读取内容
-        with open(filename, 'r', encoding='utf-8') as f:
-            content = f.read().strip()  # 读取全部内容并去除首尾空白
-        return content
+        return _read_text(filename)
     except FileNotFoundError:
         # 文件不存在时打印错误信息
         print(f"错误：找不到文件 {filename}")
         return None
 
 
-def preprocess_text(text):
+def read_files(filenames):
     """
-    文本预处理：分词并去除标点符号和停用词
+    并发读取多个文件，使各文件的打开与读取相互重叠
+
+    参数:
+        filenames (list): 要读取的文件路径列表
+
+    返回:
+        list: 与filenames顺序一致的文件内容列表，任一文件不存在时返回None
+    """
+    if not filenames:
+        return []
+
+    # 文件读取的系统调用期间会释放GIL，多个线程的读取可以并行等待磁盘
+    try:
+        with ThreadPoolExecutor(max_workers=len(filenames)) as executor:
+            return list(executor.map(_read_text, filenames))
+    except FileNotFoundError as e:
+        # 按输入顺序只报告第一个不存在的文件，与逐个读取时的提示一致
+        print(f"错误：找不到文件 {e.filename}")
+        return None
+
+
+def _iter_tokens(text):
+    """
+    使用jieba生成器分词，边分词边过滤空串、标点符号和停用词
 
     参数:
         text (str): 待处理的文本
 
     返回:
-        list: 处理后的词汇列表
+        Iterator[str]: 过滤后的词汇迭代器
     """
-    # 使用jieba进行中文分词
-    words = jieba.lcut(text)
+    # 保留的词汇经sys.intern驻留，两个文本中的相同词汇共用同一字符串对象，Counter比较时可直接按引用命中
+    return (sys.intern(w) for w in jieba.cut(text) if w and w not in _FILTERED)
 
-    # 定义要过滤的标点符号
-    punctuation = '，。！？；：""''（）【】《》、'
 
-    # 定义中文停用词列表
-    stop_words = ['的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一', '一个', '上', '也', '很',
-                  '到', '说', '要', '去', '你', '会', '着', '没有', '看', '好', '自己', '这']
+def tokenize_and_count(text):
+    """
+    文本预处理并统计词频：分词、过滤后直接计入Counter，不再生成中间词表
 
-    # 过滤标点符号和停用词，只保留有意义的词汇
-    filtered_words = []
-    for word in words:
-        # 如果单词不是标点符号且不是停用词且长度大于0，则保留
-        if word not in punctuation and word not in stop_words and len(word) > 0:
-            filtered_words.append(word)
+    参数:
+        text (str): 待处理的文本
 
-    return filtered_words
+    返回:
+        Counter: 各词汇的出现频率
+    """
+    return Counter(_iter_tokens(text))
 
 
-def calculate_similarity(original_words, plagiarized_words):
+def shingle_text(text, k=3):
     """
-    使用Jaccard相似度算法计算两个文本的相似度
+    文本预处理：去除标点符号和空白后切分为长度为k的字符片段（shingle）
+    不依赖jieba分词，可作为tokenize_and_count中jieba分词的轻量替代；
+    仅供作为库调用，命令行查重流程仍使用jieba分词
 
     参数:
-        original_words (list): 原文分词后的词汇列表
-        plagiarized_words (list): 抄袭版分词后的词汇列表
+        text (str): 待处理的文本
+        k (int): 每个字符片段的长度，必须不小于1
 
     返回:
-        float: 相似度值，范围0-1
+        tuple: 按顺序滑动得到的字符片段序列
+
+    异常:
+        ValueError: k小于1时抛出
     """
-    # 使用Counter统计两个文本中各词汇的出现频率
-    original_counter = Counter(original_words)
-    plagiarized_counter = Counter(plagiarized_words)
+    if k < 1:
+        raise ValueError(f"k必须不小于1，当前为{k}")
+
+    # 去除标点符号与空白字符
+    chars = ''.join(ch for ch in text if ch not in _PUNCT and not ch.isspace())
+
+    # 文本不足k个字符时整体作为一个片段，避免短文本被判为空
+    if len(chars) < k:
+        return (chars,) if chars else ()
+
+    return tuple(chars[i:i + k] for i in range(len(chars) - k + 1))
+
+
+def calculate_similarity(original_counter, plagiarized_counter):
+    """
+    使用Jaccard相似度算法计算两个文本的相似度
 
-    # 计算交集：两个文本中共同词汇的词频最小值之和
-    intersection = sum((original_counter & plagiarized_counter).values())
+    参数:
+        original_counter (Counter): 原文各词汇的出现频率
+        plagiarized_counter (Counter): 抄袭版各词汇的出现频率
 
-    # 计算并集：两个文本中所有词汇的词频最大值之和
-    union = sum((original_counter | plagiarized_counter).values())
+    返回:
+        float: 相似度值，范围0-1
+    """
+    # 任一文本为空时交集必为空，直接返回
+    if not original_counter or not plagiarized_counter:
+        return 0.0
+
+    # 交集（词频最小值之和）只需遍历词汇较少的一方；
+    # 并集（词频最大值之和）等于两方词频总和减去交集，无需再遍历或修改传入的Counter
+    if len(original_counter) < len(plagiarized_counter):
+        smaller, larger = original_counter, plagiarized_counter
+    else:
+        smaller, larger = plagiarized_counter, original_counter
+    intersection = 0
+    for word, b in smaller.items():
+        a = larger.get(word)
+        if a:
+            intersection += min(a, b)
+    union = sum(original_counter.values()) + sum(plagiarized_counter.values()) - intersection
 
     # 计算Jaccard相似度：交集/并集
     if union == 0:
@@ -90,6 +178,37 @@ def calculate_similarity(original_words, plagiarized_words):
     return similarity
 
 
+def calculate_similarity_minhash(original_words, plagiarized_words, num_perm=128):
+    """
+    使用MinHash签名估算两个文本的Jaccard相似度，适用于长文本
+    比较代价只与签名长度num_perm有关，与词汇量无关；需要安装可选依赖datasketch
+
+    注意：MinHash估算的是词汇集合的相似度，不考虑词频，
+    结果与calculate_similarity并不完全一致，误差约为 1/sqrt(num_perm)
+
+    参数:
+        original_words (Iterable[str]): 原文分词后的词汇，也可直接传入tokenize_and_count的结果
+        plagiarized_words (Iterable[str]): 抄袭版分词后的词汇，也可直接传入tokenize_and_count的结果
+        num_perm (int): 签名使用的哈希排列数
+
+    返回:
+        float: 相似度估计值，范围0-1
+    """
+    from datasketch import MinHash
+
+    # 分别为两个文本构建MinHash签名
+    original_minhash = MinHash(num_perm=num_perm)
+    original_minhash.update_batch([w.encode('utf-8') for w in original_words])
+    plagiarized_minhash = MinHash(num_perm=num_perm)
+    plagiarized_minhash.update_batch([w.encode('utf-8') for w in plagiarized_words])
+
+    # 任一签名为空时视为不相似，与calculate_similarity保持一致
+    if original_minhash.is_empty() or plagiarized_minhash.is_empty():
+        return 0.0
+
+    return original_minhash.jaccard(plagiarized_minhash)
+
+
 def write_result(filename, similarity):
     """
     将相似度结果写入文件
@@ -117,22 +236,30 @@ def main():
     plagiarized_file = sys.argv[2]  # 抄袭版文件路径
     output_file = sys.argv[3]  # 输出结果文件路径
 
-    # 读取原文文件
-    original_text = read_file(original_file)
-    if original_text is None:
+    # 同时读取原文与抄袭版文件
+    contents = read_files([original_file, plagiarized_file])
+    if contents is None:
         return  # 文件读取失败则退出
+    original_text, plagiarized_text = contents
 
-    # 读取抄袭版文件
-    plagiarized_text = read_file(plagiarized_file)
-    if plagiarized_text is None:
-        return  # 文件读取失败则退出
+    # 参数与文件都有效后才加载jieba词典；在后续创建并行分词进程池之前加载，
+    # 子进程可直接继承已构建的词典，不必各自重复加载
+    jieba.initialize()
+
+    # 两个文本合计足够长时才启用jieba并行分词，按CPU核数切分文本；短文本创建进程池的开销超过收益。
+    # Windows不支持并行模式，失败时退回单进程分词
+    if len(original_text) + len(plagiarized_text) >= _PARALLEL_MIN_CHARS:
+        try:
+            jieba.enable_parallel(os.cpu_count() or 2)
+        except NotImplementedError:
+            pass
 
-    # 对两个文本进行预处理（分词、去停用词等）
-    original_words = preprocess_text(original_text)
-    plagiarized_words = preprocess_text(plagiarized_text)
+    # 对两个文本进行预处理（分词、去停用词）并统计词频
+    original_counter = tokenize_and_count(original_text)
+    plagiarized_counter = tokenize_and_count(plagiarized_text)
 
     # 计算相似度
-    similarity = calculate_similarity(original_words, plagiarized_words)
+    similarity = calculate_similarity(original_counter, plagiarized_counter)
 
     # 将结果写入输出文件
     write_result(output_file, similarity)
@@ -141,146 +268,215 @@ def main():
     print(f"论文相似度: {similarity:.2f}")
 
 
-def test_identical():
+def test_identical(tokens):
     """
     测试完全相同的文本
     预期相似度：1.0
     """
-    ori_text = read_file("./test_/identical_orig.txt")
-    plag_text = read_file("./test_/identical_test.txt")
-    ori_words = preprocess_text(ori_text)
-    plag_words = preprocess_text(plag_text)
-    similarity = calculate_similarity(ori_words, plag_words)
+    similarity = calculate_similarity(tokens("./test_/identical_orig.txt"), tokens("./test_/identical_test.txt"))
     similarity = round(similarity, 2)
     assert similarity == 1.0
 
 
-def test_completely_different():
+def test_completely_different(tokens):
     """
     测试完全不同的文本
     预期相似度：0.0
     """
-    ori_text = read_file("./test_/completely_orig.txt")
-    plag_text = read_file("./test_/completely_test.txt")
-    ori_words = preprocess_text(ori_text)
-    plag_words = preprocess_text(plag_text)
-    similarity = calculate_similarity(ori_words, plag_words)
+    similarity = calculate_similarity(tokens("./test_/completely_orig.txt"), tokens("./test_/completely_test.txt"))
     similarity = round(similarity, 2)
     assert similarity == 0
 
 
-def test_partial_overlap():
+def test_partial_overlap(tokens):
     """
     测试部分重叠的文本
     预期相似度：>= 0.5
     """
-    ori_text = read_file("./test_/partial_orig.txt")
-    plag_text = read_file("./test_/partial_test.txt")
-    ori_words = preprocess_text(ori_text)
-    plag_words = preprocess_text(plag_text)
-    similarity = calculate_similarity(ori_words, plag_words)
+    similarity = calculate_similarity(tokens("./test_/partial_orig.txt"), tokens("./test_/partial_test.txt"))
     similarity = round(similarity, 2)
     assert similarity >= 0.5
 
 
-def test_empty_orig():
+def test_empty_orig(tokens):
     """
     测试原文为空的情况
     预期相似度：0.0
     """
-    ori_text = read_file("./test_/ept_orig.txt")
-    plag_text = read_file("./test_/ept_test.txt")
-    ori_words = preprocess_text(ori_text)
-    plag_words = preprocess_text(plag_text)
-    similarity = calculate_similarity(ori_words, plag_words)
+    similarity = calculate_similarity(tokens("./test_/ept_orig.txt"), tokens("./test_/ept_test.txt"))
     similarity = round(similarity, 2)
     assert similarity == 0
 
 
-def test_empty_plag():
+def test_empty_plag(tokens):
     """
     测试抄袭版为空的情况
     预期相似度：0.0
     """
-    ori_text = read_file("./test_/empty_orig.txt")
-    plag_text = read_file("./test_/empty_test.txt")
-    ori_words = preprocess_text(ori_text)
-    plag_words = preprocess_text(plag_text)
-    similarity = calculate_similarity(ori_words, plag_words)
+    similarity = calculate_similarity(tokens("./test_/empty_orig.txt"), tokens("./test_/empty_test.txt"))
     similarity = round(similarity, 2)
     assert similarity == 0
 
 
-def test_close():
+def test_close(tokens):
     """
     测试相近文本的相似度
     预期相似度：>= 0.5
     """
-    ori_text = read_file("./test_/close_orig.txt")
-    plag_text = read_file("./test_/close_test.txt")
-    ori_words = preprocess_text(ori_text)
-    plag_words = preprocess_text(plag_text)
-    similarity = calculate_similarity(ori_words, plag_words)
+    similarity = calculate_similarity(tokens("./test_/close_orig.txt"), tokens("./test_/close_test.txt"))
     similarity = round(similarity, 2)
     assert similarity >= 0.5
 
 
-def test_substring():
+def test_substring(tokens):
     """
     测试子字符串情况
     预期相似度：>= 0.5
     """
-    ori_text = read_file("./test_/substring_orig.txt")
-    plag_text = read_file("./test_/substring_test.txt")
-    ori_words = preprocess_text(ori_text)
-    plag_words = preprocess_text(plag_text)
-    similarity = calculate_similarity(ori_words, plag_words)
+    similarity = calculate_similarity(tokens("./test_/substring_orig.txt"), tokens("./test_/substring_test.txt"))
     similarity = round(similarity, 2)
     assert similarity >= 0.5
 
 
-def test_long_text():
+def test_long_text(tokens):
     """
     测试长文本的相似度
     预期相似度：>= 0.6
     """
-    ori_text = read_file("./test_/long_orig.txt")
-    plag_text = read_file("./test_/long_test.txt")
-    ori_words = preprocess_text(ori_text)
-    plag_words = preprocess_text(plag_text)
-    similarity = calculate_similarity(ori_words, plag_words)
+    similarity = calculate_similarity(tokens("./test_/long_orig.txt"), tokens("./test_/long_test.txt"))
     similarity = round(similarity, 2)
     assert similarity >= 0.6
 
 
-def test_special_chars():
+def test_special_chars(tokens):
     """
     测试包含特殊字符的文本
     预期相似度：>= 0.1
     """
-    ori_text = read_file("./test_/special_orig.txt")
-    plag_text = read_file("./test_/special_test.txt")
-    ori_words = preprocess_text(ori_text)
-    plag_words = preprocess_text(plag_text)
-    similarity = calculate_similarity(ori_words, plag_words)
+    similarity = calculate_similarity(tokens("./test_/special_orig.txt"), tokens("./test_/special_test.txt"))
     similarity = round(similarity, 2)
     assert similarity >= 0.1
 
 
-def test_unsimplified():
+def test_unsimplified(tokens):
     """
     测试繁简体转换情况
     预期相似度：0.0（区分简中和繁中）
     """
-    ori_text = read_file("./test_/unsimplified_orig.txt")
-    plag_text = read_file("./test_/unsimplified_test.txt")
-    ori_words = preprocess_text(ori_text)
-    plag_words = preprocess_text(plag_text)
-    similarity = calculate_similarity(ori_words, plag_words)
+    similarity = calculate_similarity(tokens("./test_/unsimplified_orig.txt"), tokens("./test_/unsimplified_test.txt"))
     similarity = round(similarity, 2)
     assert similarity == 0
 
 
+def test_shingle_identical():
+    """
+    测试字符片段切分下完全相同的文本
+    预期相似度：1.0
+    """
+    ori_text = read_file("./test_/identical_orig.txt")
+    plag_text = read_file("./test_/identical_test.txt")
+    ori_counter = Counter(shingle_text(ori_text))
+    plag_counter = Counter(shingle_text(plag_text))
+    similarity = calculate_similarity(ori_counter, plag_counter)
+    similarity = round(similarity, 2)
+    assert similarity == 1.0
+
+
+def test_read_file(tmp_path):
+    """
+    测试读取文件：\r\n与\r统一转换为\n，并去除首尾空白
+    """
+    crlf_file = tmp_path / "crlf.txt"
+    crlf_file.write_bytes("第一行\r\n第二行\r第三行\r\n".encode('utf-8'))
+    assert read_file(str(crlf_file)) == "第一行\n第二行\n第三行"
+
+    padded_file = tmp_path / "padded.txt"
+    padded_file.write_bytes("\n  \t论文查重 测试\t \n\n".encode('utf-8'))
+    assert read_file(str(padded_file)) == "论文查重 测试"
+
+    assert read_file(str(tmp_path / "missing.txt")) is None
+
+
+def test_read_files(tmp_path, capsys):
+    """
+    测试批量读取文件：结果与输入顺序一致；任一文件不存在时返回None，且只提示第一个不存在的文件
+    """
+    first_file = tmp_path / "first.txt"
+    first_file.write_text("第一篇", encoding='utf-8')
+    second_file = tmp_path / "second.txt"
+    second_file.write_text("第二篇", encoding='utf-8')
+    assert read_files([str(first_file), str(second_file)]) == ["第一篇", "第二篇"]
+    assert read_files([str(second_file), str(first_file)]) == ["第二篇", "第一篇"]
+
+    missing_a = str(tmp_path / "missing_a.txt")
+    missing_b = str(tmp_path / "missing_b.txt")
+    assert read_files([str(first_file), missing_a]) is None
+    assert read_files([missing_a, missing_b]) is None
+    output = capsys.readouterr().out.splitlines()
+    assert output == [f"错误：找不到文件 {missing_a}", f"错误：找不到文件 {missing_a}"]
+
+    assert read_files([]) == []
+
+
+def test_tokenize_and_count():
+    """
+    测试分词并统计词频：去除标点符号与停用词，按出现次数计数
+    """
+    counter = tokenize_and_count("我爱北京，北京是首都。")
+    assert counter["北京"] == 2
+    assert counter["首都"] == 1
+    assert "，" not in counter and "。" not in counter
+    assert "我" not in counter and "是" not in counter
+    assert tokenize_and_count("") == Counter()
+
+
+def test_shingle_text():
+    """
+    测试字符片段切分：去除标点与空白后按长度k滑动切分，不足k个字符时整体作为一个片段，k小于1时抛出ValueError
+    """
+    assert shingle_text("今天，天气 很好。") == ("今天天", "天天气", "天气很", "气很好")
+    assert shingle_text("今天天气", k=2) == ("今天", "天天", "天气")
+    assert shingle_text("你好") == ("你好",)
+    assert shingle_text("，。 \n") == ()
+
+    import pytest
+    with pytest.raises(ValueError):
+        shingle_text("abcd", k=0)
+
+
+def test_shingle_partial():
+    """
+    测试字符片段切分下部分重叠的文本
+    预期相似度：介于0和1之间
+    """
+    ori_text = read_file("./test_/partial_orig.txt")
+    plag_text = read_file("./test_/partial_test.txt")
+    ori_counter = Counter(shingle_text(ori_text))
+    plag_counter = Counter(shingle_text(plag_text))
+    similarity = calculate_similarity(ori_counter, plag_counter)
+    assert 0 < similarity < 1
+
+
+def test_minhash(tokens):
+    """
+    测试MinHash估算的相似度（需要安装datasketch，未安装时跳过）
+    预期相似度：相同文本约为1.0，完全不同的文本约为0.0
+    """
+    import pytest
+    pytest.importorskip("datasketch")
+
+    similarity = calculate_similarity_minhash(tokens("./test_/identical_orig.txt"),
+                                              tokens("./test_/identical_test.txt"))
+    assert round(similarity, 2) == 1.0
+
+    similarity = calculate_similarity_minhash(tokens("./test_/completely_orig.txt"),
+                                              tokens("./test_/completely_test.txt"))
+    assert similarity <= 0.1
+
+    similarity = calculate_similarity_minhash(tokens("./test_/ept_orig.txt"), tokens("./test_/ept_test.txt"))
+    assert similarity == 0.0
+
+
 # 程序入口点
 if __name__ == "__main__":
     main()